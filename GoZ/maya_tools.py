@@ -22,15 +22,28 @@ CONSTANTS:
     GARBAGE_NODES -- nodes marked for removal in maya
                      used to prevent duplicates
 
+    _SOCK_POOL    -- idle sockets to ZBrushServer keyed by (host, port)
+                     reused between sends to skip reconnecting
+
 """
 
 import socket
 import errno
+import sys
+import logging
+import Queue
+from threading import Thread
 import GoZ.errs as errs
 import GoZ.utils as utils
 import maya.cmds as cmds
 import os
 
+log = logging.getLogger(__name__)
+# default to INFO so loaded/listening messages show,
+# unless the host already configured this logger
+if log.level == logging.NOTSET:
+    log.setLevel(logging.INFO)
+
 # nodes marked for removal from maya on import from ZBrush
 GARBAGE_NODES = ['blinn',
                  'blinnSG',
@@ -38,6 +51,22 @@ GARBAGE_NODES = ['blinn',
                  'ZBrushTexture',
                  'place2dTexture2']
 
+# name suffixes of GARBAGE_NODES, composed once at import
+_GARBAGE_SUFFIXES = tuple('_' + node for node in GARBAGE_NODES)
+
+# idle ZBrushServer connections, (host, port) -> socket
+_SOCK_POOL = {}
+
+# utils.get_net_info results, MNET/ZNET -> (host, port)
+_NET_INFO = {}
+
+
+def _net_info(net_env):
+    """ utils.get_net_info, env vars are only parsed once per session """
+    if net_env not in _NET_INFO:
+        _NET_INFO[net_env] = utils.get_net_info(net_env)
+    return _NET_INFO[net_env]
+
 
 class MayaServer(object):
 
@@ -59,7 +88,7 @@ class MayaServer(object):
 
     def __init__(self):
         """gets networking info, creates command port name """
-        self.host, self.port = utils.get_net_info('MNET')
+        self.host, self.port = _net_info('MNET')
 
         self.cmdport_name = "%s:%s" % (self.host, self.port)
         self.status = False
@@ -78,7 +107,7 @@ class MayaServer(object):
         if self.status is False:
             cmds.commandPort(name=self.cmdport_name, sourceType='python')
             self.status = cmds.commandPort(self.cmdport_name, query=True)
-        print 'listening %s' % self.cmdport_name
+        log.info('listening %s', self.cmdport_name)
 
     def stop(self):
         """ stop command port """
@@ -86,7 +115,7 @@ class MayaServer(object):
                          sourceType='python', close=True)
         self.status = cmds.commandPort(self.cmdport_name,
                                        query=True)
-        print 'closing %s' % self.cmdport_name
+        log.info('closing %s', self.cmdport_name)
 
 # Maya-side callbacks
 
@@ -109,13 +138,14 @@ def load(file_path, obj_name, parent_name):
 def cleanup(name):
     """ removes un-used nodes on import of obj"""
 
-    if cmds.objExists(name):
-        cmds.delete(name)
+    candidates = [name] + [name + suffix for suffix in _GARBAGE_SUFFIXES]
 
-    for node in GARBAGE_NODES:
-        node = name + '_' + node
-        if cmds.objExists(node):
-            cmds.delete(node)
+    # one ls call instead of an objExists per node,
+    # one delete call for all of them
+    to_delete = cmds.ls(candidates)
+
+    if to_delete:
+        cmds.delete(to_delete)
 
 
 class ZBrushClient(object):
@@ -132,50 +162,141 @@ class ZBrushClient(object):
         self.status      -- status of the connection to ZBrushServer
         self.ascii_path  -- current maya ascii file export path
         self.objs        -- list of objects to send to ZBrushServer
+        self.send_pairs  -- (object, GoZParent) pairs from the last export
         self.host        -- current host obtained from utils.get_net_info
         self.port        -- current port obtained from utils.get_net_info
         self.sock        -- current open socket connection
+        self.sock_key    -- (host, port) self.sock was opened against
+        self.sock_reused -- True if self.sock came out of the pool
 
     """
 
     def __init__(self):
         """gets networking information, initalizes  client"""
 
-        self.host, self.port = utils.get_net_info('ZNET')
+        self.host, self.port = _net_info('ZNET')
         self.status = False
         self.sock = None
+        self.sock_key = None
+        self.sock_reused = False
         self.objs = None
+        self.send_pairs = None
         self.goz_id = None
         self.goz_obj = None
         self.ascii_path = None
 
     def connect(self):
-        """connects to ZBrushServer """
+        """
+        connects to ZBrushServer, reuses a pooled socket if possible
 
-        try:
-            # close old socket, might not exist so skip
-            self.sock.close()
-        except AttributeError:
-            print 'no socket to close...'
+        a reused socket is pinged first, so status is only set
+        when ZBrushServer actually answers
+        """
 
         self.status = False
 
         utils.validate_host(self.host)
         utils.validate_port(self.port)
 
-        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._acquire_socket(check=True)
+
+        self.status = True
+
+    def _acquire_socket(self, check=False):
+        """
+        sets self.sock to a live connection to ZBrushServer
+
+        a pooled socket for host/port is reused, otherwise a new
+        connection is opened
+
+        with check set the pooled socket is pinged before reuse,
+        send skips this and lets _send_obj replace a dead socket
+        """
+
+        # hand back any socket we hold, it may be the one we want
+        self.release()
+
+        key = (self.host, self.port)
+        sock = _SOCK_POOL.pop(key, None)
+
+        if sock is not None:
+            if not check or self._ping(sock):
+                self.sock = sock
+                self.sock_key = key
+                self.sock_reused = True
+                return
+            # stale connection, server restarted or went away
+            sock.close()
+
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        # control messages are tiny, send them without waiting on Nagle
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        # let the os notice dead peers while the socket sits in the pool
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
         # time out incase of a bad host/port that actually exists
-        self.sock.settimeout(45)
+        sock.settimeout(45)
 
         try:
-            self.sock.connect((self.host, int(self.port)))
+            sock.connect((self.host, int(self.port)))
         except socket.error as err:
-            self.status = False
-            if errno.ECONNREFUSED in err:
+            # never keep or pool a socket that failed to connect
+            sock.close()
+            if err.errno == errno.ECONNREFUSED:
                 raise errs.ZBrushServerError(
                     'Connection Refused: %s:%s' % (self.host, self.port))
+            raise errs.ZBrushServerError(
+                'Connection Failed: %s:%s (%s)' % (self.host, self.port, err))
 
-        self.status = True
+        self.sock = sock
+        self.sock_key = key
+        self.sock_reused = False
+
+    @staticmethod
+    def _ping(sock):
+        """ checks ZBrushServer answers on sock """
+        try:
+            utils.send_msg(sock, 'check')
+            return utils.recv_msg(sock) == 'ok'
+        except socket.error:
+            return False
+
+    def release(self):
+        """
+        returns the current socket to the pool for reuse
+
+        if host/port changed since it was opened (gui update_network)
+        the socket is closed instead, nothing would ever reuse it
+        """
+
+        if self.sock is None:
+            return
+
+        if self.sock_key != (self.host, self.port):
+            self.sock.close()
+        else:
+            old_sock = _SOCK_POOL.get(self.sock_key)
+            if old_sock is not None and old_sock is not self.sock:
+                old_sock.close()
+
+            _SOCK_POOL[self.sock_key] = self.sock
+
+        self.sock = None
+        self.sock_key = None
+
+    def close(self):
+        """ closes the current socket, drops any pooled one for host/port """
+
+        if self.sock is not None:
+            self.sock.close()
+
+        for key in (self.sock_key, (self.host, self.port)):
+            pooled = _SOCK_POOL.pop(key, None)
+            if pooled is not None:
+                pooled.close()
+
+        self.status = False
+        self.sock = None
+        self.sock_key = None
 
     def check_socket(self):
         """ verify connection to zbrush """
@@ -184,82 +305,151 @@ class ZBrushClient(object):
             return
 
         try:
-            self.sock.send('check')
-            if self.sock.recv(1024) == 'ok':
+            self._send_msg('check')
+            if self._recv_msg() == 'ok':
                 # connected
-                print 'connected!'
+                log.debug('connected!')
             else:
                 # bad connection, clear socket
-                self.status = False
-                self.sock.close()
-                self.sock = None
-                print 'conn reset!'
+                self.close()
+                log.debug('conn reset!')
 
         except socket.error as err:
             # catches server down errors, resets socket
-            self.status = False
-            self.sock.close()
-            self.sock = None
-            if errno.ECONNREFUSED in err:
-                print 'conn ref'
+            self.close()
+            if err.errno == errno.ECONNREFUSED:
+                log.debug('conn ref')
                 # server probbly down
-            if errno.EADDRINUSE in err:
+            if err.errno == errno.EADDRINUSE:
                 # this is fine
-                print 'already connected...'
-            if errno.EPIPE in err:
+                log.debug('already connected...')
+            if err.errno == errno.EPIPE:
                 # server down, or unexpected connection interuption
-                print 'broken pipe, trying to reconnect'
+                log.debug('broken pipe, trying to reconnect')
         except AttributeError:
-            print 'need new sock'
+            log.debug('need new sock')
+
+    def _send_msg(self, payload):
+        """ sends a framed message to ZBrushServer """
+        utils.send_msg(self.sock, payload)
+
+    def _recv_msg(self):
+        """ reads a framed reply from ZBrushServer """
+        return utils.recv_msg(self.sock)
 
     def send(self):
         """
-        send a file load command to ZBrush via ZBrushServer
+        send file load commands to ZBrush via ZBrushServer
 
-        commands are send looking like:
-        open|object#parentobject:nextobject#nextparent
+        a command is sent for each object as soon as it is exported,
+        looking like:
+        open|object#parentobject
 
         this is then parsed by ZBrushServer
+
+        sending happens on a worker thread so ZBrush can load a file
+        while maya exports the next one, cmds and logging stay on the
+        main thread
         """
 
         # export, send
         if self.status:
-            self.export()
+            if self.sock is None:
+                self._acquire_socket()
+
+            send_queue = Queue.Queue()
+            send_loaded = []
+            send_errors = []
+            worker = Thread(target=self._send_worker,
+                            args=(send_queue, send_loaded, send_errors))
+            worker.daemon = True
+            worker.start()
+
+            try:
+                for obj in self.export():
+                    if send_errors:
+                        break
+                    send_queue.put(obj)
+            finally:
+                # None tells the worker no more objects are coming
+                send_queue.put(None)
+                worker.join()
+
+            for obj in send_loaded:
+                log.info('ZBrush Loaded: %s', obj)
+
+            if send_errors:
+                self.close()
+                err_type, err, traceback = send_errors[0]
+                log.error('%s', err)
+                raise err_type, err, traceback
+
+            self.release()
+        else:
+            raise errs.ZBrushServerError(
+                'Please connect to ZBrushServer first')
+
+    def _send_worker(self, send_queue, send_loaded, send_errors):
+        """
+        sends queued objects to ZBrushServer until None is queued
 
-            sendlist = []
+        loaded objects are stored in send_loaded, exc_info of a failure
+        in send_errors, for send to log/raise on the main thread
+        """
 
-            # organize lists so top level objects are first
-            for obj in self.objs:
-                if obj.split('#')[0] == obj.split('#')[1]:
-                    sendlist.append(obj)
+        # a pooled socket may have died while idle, nothing has been
+        # loaded through it yet so the first object can be resent
+        retry = self.sock_reused
+
+        while True:
+            obj = send_queue.get()
+            if obj is None:
+                return
+            try:
+                self._send_obj(obj, retry)
+            except Exception:
+                send_errors.append(sys.exc_info())
+                return
+            send_loaded.append(obj)
+            retry = False
+
+    def _send_obj(self, obj, retry):
+        """
+        sends one object and waits for it to load
 
-            for obj in self.objs:
-                if obj.split('#')[0] != obj.split('#')[1]:
-                    sendlist.append(obj)
+        if retry is set a dropped connection is reopened once
+        and the object sent again
+        """
 
-            self.sock.send('open|' + ':'.join(sendlist))
-            # check receipt of objs
+        try:
+            self._send_msg('open|' + obj)
+            # check receipt of obj
+            self.load_confirm()
+        except (socket.error, errs.ZBrushServerError) as err:
+            if not retry:
+                raise
+            if isinstance(err, socket.error) and \
+                    err.errno not in (errno.EPIPE, errno.ECONNRESET):
+                raise
+            # stale connection, reconnect
+            self.close()
+            self.connect()
+            self._send_msg('open|' + obj)
             self.load_confirm()
-        else:
-            raise errs.ZBrushServerError(
-                'Please connect to ZBrushServer first')
 
     def load_confirm(self):
         """
         checks with ZBrushServer to make
-        sure objects are loaded after a send
+        sure an object is loaded after a send
 
         'loaded' will be sent back from ZBrushServer
         on load of a object from maya
+
+        runs on the send worker thread, so nothing is logged here
         """
 
-        if self.sock.recv(1024) == 'loaded':
-            print 'ZBrush Loaded:'
-            print ('\n'.join(self.objs))
-        else:
-            self.status = False
-            self.sock = None
-            print 'ZBrushServer is down!'
+        if self._recv_msg() != 'loaded':
+            self.close()
             raise errs.ZBrushServerError('ZBrushServer is down!')
 
     def export(self):
@@ -274,15 +464,49 @@ class ZBrushClient(object):
 
         GoZParent is also appended to the export string: objectname#gozparentname
 
+        this is a generator, each export string is yielded once its file
+        is saved, top level objects are exported first
+
+        self.objs is left as selected, parents are kept in self.send_pairs
+
         """
 
-        print self.objs
+        log.debug('%s', self.objs)
 
         # default pm3d star
 
         new_objects = []
 
-        for idx, obj in enumerate(self.objs):
+        # objects that already have a GoZParent, queried once for all objs
+        # recursive also matches objects in namespaces/references
+        parented = set(cmds.ls('*.GoZParent', objectsOnly=True,
+                               recursive=True) or [])
+
+        self.send_pairs = []
+
+        for obj in self.objs:
+
+            if obj in parented:
+                # object existed in zbrush, has 'parent' tool
+                parent = cmds.getAttr(obj + '.GoZParent')
+            else:
+                # construct a list of objects to create
+                # append all future objects as sub tools
+                new_objects.append(obj)
+                parent = new_objects[0]
+            self.send_pairs.append((obj, parent))
+
+        # organize lists so top level objects are first
+        top_pairs = []
+        sub_pairs = []
+
+        for obj, parent in self.send_pairs:
+            if obj == parent:
+                top_pairs.append((obj, parent))
+            else:
+                sub_pairs.append((obj, parent))
+
+        for obj, parent in top_pairs + sub_pairs:
 
             cmds.select(cl=True)
             cmds.select(obj)
@@ -293,22 +517,16 @@ class ZBrushClient(object):
                       options="v=0",
                       type="mayaAscii",
                       exportSelected=True)
-            if cmds.attributeQuery('GoZParent', node=obj, exists=True):
-                # object existed in zbrush, has 'parent' tool
-                parent = cmds.getAttr(obj + '.GoZParent')
-            else:
-                # construct a list of objects to create
-                # append all future objects as sub tools
-                new_objects.append(obj)
-                parent = new_objects[0]
+            if obj in new_objects:
                 cmds.addAttr(obj, longName='GoZParent', dataType='string')
                 cmds.setAttr(obj + '.GoZParent', parent, type='string')
-            self.objs[idx] = obj + '#' + parent
 
             # maya is often run as root, this makes sure osx can open/save files
             # not needed if maya is run un-privileged
             os.chmod(self.ascii_path, 0o777)
 
+            yield '%s#%s' % (obj, parent)
+
     def parse_objs(self):
         """
         grab meshes from selection, filters out extraneous dag objects
@@ -327,6 +545,14 @@ class ZBrushClient(object):
         else:
             return False
 
+    @staticmethod
+    def _shape_xform(node):
+        """ returns full paths to the mesh shape of node and its xform """
+        shape = cmds.listRelatives(node, shapes=True, fullPath=True,
+                                   type='mesh', noIntermediate=True)[0]
+        xform = cmds.listRelatives(shape, parent=True, fullPath=True)[0]
+        return shape, xform
+
     def get_gozid_mismatches(self):
         """
         checks object history for instances of GoZBrushID,
@@ -344,25 +570,29 @@ class ZBrushClient(object):
 
         goz_list = []
 
+        # GoZBrushID of every node carrying one, built once instead of
+        # running attributeQuery on each object and history node
+        # recursive also matches nodes in namespaces/references
+        id_nodes = cmds.ls('*.GoZBrushID', objectsOnly=True,
+                           long=True, recursive=True) or []
+        id_map = dict((node, cmds.getAttr(node + '.GoZBrushID'))
+                      for node in id_nodes)
+
         for obj in self.objs:
 
-            goz_check = cmds.attributeQuery(
-                'GoZBrushID', node=obj, exists=True)
+            long_obj = cmds.ls(obj, long=True)[0]
 
-            if goz_check:
+            if long_obj in id_map:
                 # check for 'rename'
-                goz_id = cmds.getAttr(obj + '.GoZBrushID')
+                goz_id = id_map[long_obj]
                 if obj != goz_id:
                     goz_list.append((obj, goz_id))
             else:
                 # check for old ID in history
-                history = cmds.listHistory(obj)
+                history = cmds.ls(cmds.listHistory(obj) or [], long=True)
                 for old_obj in history:
-                    goz_check = cmds.attributeQuery('GoZBrushID',
-                                                    node=old_obj,
-                                                    exists=True)
-                    if goz_check:
-                        goz_id = cmds.getAttr(old_obj + '.GoZBrushID')
+                    if old_obj in id_map:
+                        goz_id = id_map[old_obj]
                         if obj != goz_id:
                             goz_list.append((obj, goz_id))
 
@@ -389,10 +619,7 @@ class ZBrushClient(object):
             cmds.delete(goz_id)
 
         cmds.rename(obj, goz_id)
-        cmds.select(cl=True)
-        cmds.select(goz_id)
-        shape = cmds.ls(selection=True, type='mesh', dag=True)[0]
-        xform = cmds.listRelatives(shape, parent=True, fullPath=True)[0]
+        shape, xform = self._shape_xform(goz_id)
         goz_check_xform = cmds.attributeQuery(
             'GoZBrushID', node=xform, exists=True)
         goz_check_shape = cmds.attributeQuery(
@@ -408,7 +635,7 @@ class ZBrushClient(object):
         cmds.select(cl=True)
         pre_sel.remove(obj)
         pre_sel.append(xform)
-        print pre_sel
+        log.debug('%s', pre_sel)
         cmds.select(pre_sel)
 
     def create(self):
@@ -420,10 +647,7 @@ class ZBrushClient(object):
         obj = self.goz_obj
         pre_sel = cmds.ls(sl=True)
         cmds.delete(obj, ch=True)
-        cmds.select(cl=True)
-        cmds.select(obj)
-        shape = cmds.ls(selection=True, type='mesh', dag=True)[0]
-        xform = cmds.listRelatives(shape, parent=True, fullPath=True)[0]
+        shape, xform = self._shape_xform(obj)
         goz_check_xform = cmds.attributeQuery(
             'GoZBrushID', node=xform, exists=True)
         goz_check_shape = cmds.attributeQuery(
@@ -14,10 +14,16 @@ CONSTANTS:
     SHARED_DIR_*    -- default OSX file plath for 'localmode'
     SHARED_DIR_*    -- default WIN file path for 'localmode'
 
+    FRAME_HEADER    -- struct format of the length prefix on socket messages
+    FRAME_MAX       -- largest payload accepted by recv_msg
+    RECV_CHUNK      -- most bytes requested from a socket per recv
+
 """
 
 import os
+import errno
 import socket
+import struct
 from GoZ import errs
 from contextlib import contextmanager
 import sys
@@ -39,6 +45,15 @@ ZBRUSH_ENV = 'ZNET'
 # default network info
 DEFAULT_NET = {MAYA_ENV: 'localhost:6667', ZBRUSH_ENV: 'localhost:6668'}
 
+# network byte order unsigned int, length of the payload that follows
+FRAME_HEADER = '!I'
+
+# object lists are small, anything bigger is a stray or broken client
+FRAME_MAX = 1 << 20
+
+# bounds the buffer allocated per recv call
+RECV_CHUNK = 4096
+
 
 @contextmanager
 def err_handler(gui):
@@ -127,6 +142,55 @@ def get_net_info(net_env):
         return validate(net_string)
 
 
+def send_msg(sock, payload):
+    """ sends a length prefixed payload as one contiguous buffer """
+    # maya.cmds returns unicode names, frame the encoded bytes
+    if isinstance(payload, unicode):
+        payload = payload.encode('utf-8')
+    header = struct.pack(FRAME_HEADER, len(payload))
+    sock.sendall(header + payload)
+
+
+def recv_exact(sock, size):
+    """
+    reads exactly size bytes from sock
+
+    returns a shorter string if the peer closes the connection early
+    """
+    chunks = []
+    remaining = size
+    while remaining > 0:
+        chunk = sock.recv(min(remaining, RECV_CHUNK))
+        if not chunk:
+            break
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return ''.join(chunks)
+
+
+def recv_msg(sock):
+    """
+    reads one length prefixed payload from sock
+
+    returns '' if the connection was closed, even part way through a frame
+
+    raises socket.error (EPROTO) for frames larger than FRAME_MAX,
+    such as unframed data from an old client
+    """
+    header_size = struct.calcsize(FRAME_HEADER)
+    header = recv_exact(sock, header_size)
+    if len(header) < header_size:
+        return ''
+    size = struct.unpack(FRAME_HEADER, header)[0]
+    if size > FRAME_MAX:
+        raise socket.error(errno.EPROTO,
+                           'frame of %s bytes exceeds FRAME_MAX' % size)
+    body = recv_exact(sock, size)
+    if len(body) < size:
+        return ''
+    return body
+
+
 def split_file_name(file_path):
     """ recovers 'name' from file, strips ext and dir """
     file_name = os.path.splitext(file_path)[0]
@@ -101,6 +101,8 @@ class ZBrushHandler(SocketServer.BaseRequestHandler):
     custom handler for ZBrushSever
     handles loading objects from maya
 
+    messages are length prefixed frames, see utils.send_msg/recv_msg
+
     splits:
     open|objectname#objectparent:anotherobject#anotherparent...
 
@@ -114,14 +116,19 @@ class ZBrushHandler(SocketServer.BaseRequestHandler):
     def handle(self):
         # keep handle open until client/server close
         while True:
-            data = self.request.recv(1024).strip()
+            try:
+                data = utils.recv_msg(self.request).strip()
+            except socket.error as err:
+                # oversized/unframed data, drop the client
+                print err
+                data = None
             if not data:
                 self.request.close()
                 break
             print data
             # check for conn-reset/disconnect by peer (on client)
             if data == 'check':
-                self.request.send('ok')
+                utils.send_msg(self.request, 'ok')
 
             # parse object list from maya
             if data.split('|')[0] == 'open':
@@ -134,7 +141,7 @@ class ZBrushHandler(SocketServer.BaseRequestHandler):
                     zs_temp = self.zbrush_open(obj + '.ma', parent)
                     utils.send_osa(zs_temp)
                 print 'loaded all objs!'
-                self.request.send('loaded')
+                utils.send_msg(self.request, 'loaded')
 
     @staticmethod
     def zbrush_open(name, parent):
@@ -624,6 +631,7 @@ class MayaClient(object):
         maya_cmd += 'cmds.sphere(name="goz_server_test;")'
         maya_cmd += 'cmds.delete("goz_server_test")'
         maya = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        maya.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
         maya.settimeout(5)
         try:
             maya.connect((self.host, int(self.port)))
@@ -671,6 +679,7 @@ class MayaClient(object):
         print maya_cmd
 
         maya = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        maya.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
         host, port = utils.get_net_info('MNET')
 
         print host, port